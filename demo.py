@@ -1,30 +1,61 @@
 import rplife
-import time
+import tkinter as tk
 
 
-# Define a function to load a pattern and run the GUI simulation
-def run_simulation(pattern_name, grid_size=20, cell_size=20, refresh_rate=50):
+def load_life(pattern_name, grid_size=20):
     """
-    Run a GUI simulation with a specific pattern.
+    Load a specific pattern into a LifeGrid.
 
     Args:
         pattern_name (str): The name of the pattern to load.
         grid_size (int): The size of the grid for the simulation.
+
+    Returns:
+        LifeGrid: The LifeGrid initialized with the pattern.
+    """
+    # Load the alive cells from the pattern as a set of tuples
+    alive_cells_set = rplife.load_from_toml(file_name="rplife/patterns.toml", pattern_name=pattern_name)
+
+    # Initialize the LifeGrid
+    return rplife.LifeGrid(pattern=alive_cells_set, grid_size=grid_size)
+
+
+# Define a function to run the GUI simulations of several patterns
+def run_simulations(pattern_names, grid_size=20, cell_size=20, refresh_rate=50):
+    """
+    Run GUI simulations of the patterns one after another, in a single window.
+    Closing the window moves on to the next pattern.
+
+    Args:
+        pattern_names (list): The names of the patterns to simulate, in order.
+        grid_size (int): The size of the grid for the simulation.
         cell_size (int): The size of each cell in the GUI.
         refresh_rate (int): The refresh rate of the GUI in milliseconds.
     """
-    # Load the alive cells from the pattern
-    alive_cells = rplife.load_from_toml(file_name="rplife/patterns.toml", pattern_name=pattern_name)
+    # Load every pattern up front, so switching patterns is immediate
+    lives = [load_life(pattern_name, grid_size) for pattern_name in pattern_names]
 
-    # Convert the alive cells to a set of tuples
-    alive_cells_set = set(tuple(cell) for cell in alive_cells)
+    # Create the window once and reuse it for every pattern
+    root = tk.Tk()
+    gui = rplife.GuiSimulation(life=lives[0], cell_size=cell_size, refresh_rate=refresh_rate, root=root)
+    print(f"Running simulation for pattern: {pattern_names[0]}")
 
-    # Initialize the LifeGrid
-    life = rplife.LifeGrid(pattern=alive_cells_set, grid_size=grid_size)
+    current = 0
+
+    def next_pattern():
+        nonlocal current
+        print(f"Finished simulation for pattern: {pattern_names[current]}")
+        current += 1
 
-    # Run the GUI simulation
-    print(f"Running simulation for pattern: {pattern_name}")
-    rplife.GuiSimulation(life=life, cell_size=cell_size, refresh_rate=refresh_rate)
+        if current == len(lives):
+            root.destroy()
+            return
+
+        print(f"Running simulation for pattern: {pattern_names[current]}")
+        gui.load_pattern(lives[current])
+
+    root.protocol("WM_DELETE_WINDOW", next_pattern)
+    gui.run()
 
 
 if __name__ == "__main__":
@@ -32,9 +63,4 @@ if __name__ == "__main__":
     patterns = ["9:131", "8:118", "10:124", "10:126", "7:105"]
 
     # Sequentially run each simulation
-    for pattern in patterns:
-        run_simulation(pattern_name=pattern)
-
-        # Pause briefly between simulations
-        print(f"Finished simulation for pattern: {pattern}")
-        time.sleep(1)
+    run_simulations(pattern_names=patterns)
@@ -1,13 +1,80 @@
 # rplife/genetic_algorithm.py
 
+import itertools
+import os
 import random
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from rplife.grid import LifeGrid
 from rplife.simulation import Simulation
 from rplife.pattern import save_to_toml
 
 
+_FITNESS_CACHE_SIZE = 100_000
+_fitness_cache = {}  # Maps the (board, grid size) of simulated chromosomes to their fitness, per process
+
+
+def _cache_fitness(key, fitness):
+    """
+    Stores the fitness of a simulated pattern, dropping the oldest entry once the cache is full.
+
+    Args:
+        key (tuple): The (board, grid size) of the simulated chromosome.
+        fitness (int): The fitness of the chromosome.
+    """
+    if len(_fitness_cache) >= _FITNESS_CACHE_SIZE:
+        del _fitness_cache[next(iter(_fitness_cache))]
+    _fitness_cache[key] = fitness
+
+
+def _evaluate_fitness(chromosome: LifeGrid):
+    """
+    Simulates a chromosome and returns the max size it reached. Patterns that were already
+    simulated in this process (e.g. duplicates within the population) are not simulated again.
+
+    Defined at module level so it can be pickled and run in a worker process.
+
+    Args:
+        chromosome (LifeGrid): A LifeGrid object representing a chromosome.
+
+    Returns:
+        int: The max size reached during the simulation of the chromosome.
+    """
+    key = (chromosome.board, chromosome.end_row)
+    if key not in _fitness_cache:
+        sim = Simulation(chromosome)  # Simulate the chromosome
+        sim.simulate()  # Run the simulation
+        _cache_fitness(key, sim.get_max_size())  # Get the max size reached during the simulation
+    return _fitness_cache[key]
+
+
+def _evaluate_fitness_batch(chromosomes):
+    """
+    Evaluates the fitness of a batch of chromosomes in a worker process,
+    simulating the patterns that were not simulated before in lockstep.
+
+    Args:
+        chromosomes (list): A list of LifeGrid objects representing chromosomes.
+
+    Returns:
+        list: The fitness of each chromosome, in the same order.
+    """
+    keys = [(chromosome.board, chromosome.end_row) for chromosome in chromosomes]
+    fitnesses = {key: _fitness_cache[key] for key in keys if key in _fitness_cache}
+
+    # Simulate each new pattern once, even if it appears several times in the batch
+    new_chromosomes = {}
+    for key, chromosome in zip(keys, chromosomes):
+        if key not in fitnesses:
+            new_chromosomes.setdefault(key, chromosome)
+
+    for key, fitness in zip(new_chromosomes, Simulation.simulate_batch(list(new_chromosomes.values()))):
+        fitnesses[key] = fitness
+        _cache_fitness(key, fitness)
+
+    return [fitnesses[key] for key in keys]
+
+
 class GeneticAlgorithm:
     """
     Class for implementing a Genetic Algorithm to find a "Methuselah" pattern
@@ -20,7 +87,7 @@ class GeneticAlgorithm:
     """
 
     def __init__(self, pop_size=50, grid_size=20, min_cells=5, max_cells=10, gen_limit=200,
-                 crossover_prob=0.8, mutation_prob=0.8, mutation_count=3, threshold_fit=100):
+                 crossover_prob=0.8, mutation_prob=0.8, mutation_count=3, threshold_fit=100, max_workers=None):
         """
         Initializes the Genetic Algorithm.
 
@@ -33,6 +100,8 @@ class GeneticAlgorithm:
             crossover_prob (float): Probability of performing crossover.
             mutation_prob (float): Probability of performing mutation.
             threshold_fit (int): Target fitness value to find a "Methuselah".
+            max_workers (int, optional): Number of worker processes used to evaluate fitness.
+                                         Defaults to the number of CPUs.
         """
         self.pop_size = pop_size
         self.grid_size = grid_size
@@ -46,6 +115,27 @@ class GeneticAlgorithm:
         self.population = []
         self.pop_fit = 0  # Total fitness of the population
 
+        # Square region of the grid where random cells are placed, indexed row-major from 0 to seed_side ** 2 - 1
+        self.seed_origin = grid_size // 4
+        self.seed_side = max_cells // 2 + 1
+
+        # Persistent pool of worker processes for evaluating fitness in parallel
+        self.max_workers = max_workers or os.cpu_count()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def close(self):
+        """
+        Shuts down the worker processes used to evaluate fitness.
+        """
+        self._executor.shutdown()
+
+    def __del__(self):
+        """
+        Shuts down the worker processes when the Genetic Algorithm is garbage collected.
+        """
+        if hasattr(self, "_executor"):
+            self.close()
+
     def find_methuselah(self):
         """
         Runs the Genetic Algorithm to find a LifeGrid (chromosome) whose fitness exceeds the threshold_fit.
@@ -62,9 +152,15 @@ class GeneticAlgorithm:
             # Variable to track the best fitness in the current generation
             best_fitness = 0
 
-            # Step 2: Check for Methuselah in the current population
+            # Step 2: Evaluate the population in parallel, stopping as soon as a Methuselah is found
+            methuselah = self.evaluate_population(stop_fit=self.threshold_fit)
+            if methuselah is not None:
+                print(f"Found Methuselah in generation {generation} with fitness: {methuselah.fitness}")
+                return methuselah, methuselah.fitness
+
+            # Check the rest of the population for Methuselah, including already evaluated individuals
             for individual in self.population:
-                fitness = self.get_fitness(individual)
+                fitness = individual.fitness
 
                 # Update the best fitness if the current fitness is higher
                 if fitness > best_fitness:
@@ -95,19 +191,31 @@ class GeneticAlgorithm:
             LifeGrid: A LifeGrid object with a random pattern.
         """
         num_cells = random.randint(self.min_cells, self.max_cells)  # Random number of cells
-        random_pattern = set()
+        num_cells = min(num_cells, self.seed_side ** 2)  # The region can't hold more unique cells
 
-        while len(random_pattern) < num_cells:
-            row = random.randint(self.grid_size // 4, self.grid_size // 4 + self.max_cells // 2)
-            col = random.randint(self.grid_size // 4, self.grid_size // 4 + self.max_cells // 2)
-            random_pattern.add((row, col))  # Add unique (row, col) coordinates
+        # Sample unique cell indices of the region in one call, instead of retrying duplicates
+        random_pattern = {self._region_cell(index) for index in random.sample(range(self.seed_side ** 2), num_cells)}
 
         return LifeGrid(random_pattern, self.grid_size)
 
+    def _region_cell(self, index):
+        """
+        Converts a row-major index within the seeding region to grid coordinates.
+
+        Args:
+            index (int): The index of the cell within the region.
+
+        Returns:
+            tuple: The (row, col) coordinates of the cell on the grid.
+        """
+        row, col = divmod(index, self.seed_side)
+        return self.seed_origin + row, self.seed_origin + col
+
     @staticmethod
     def get_fitness(chromosome: LifeGrid):
         """
         Calculates the fitness of a chromosome based on the max size from simulation.
+        The result is cached on the chromosome, so it is only simulated once.
 
         Args:
             chromosome (LifeGrid): A LifeGrid object representing a chromosome.
@@ -115,10 +223,49 @@ class GeneticAlgorithm:
         Returns:
             float: Fitness value for the chromosome based on max size after simulation.
         """
-        sim = Simulation(chromosome)  # Simulate the chromosome
-        sim.simulate()  # Run the simulation
-        max_size = sim.get_max_size()  # Get the max size reached during the simulation
-        return max_size
+        if chromosome.fitness is None:
+            chromosome.fitness = _evaluate_fitness(chromosome)
+        return chromosome.fitness
+
+    def evaluate_population(self, stop_fit=None):
+        """
+        Evaluates the fitness of the chromosomes in the population in parallel,
+        spreading batches of simulations across the worker processes. Only chromosomes
+        without a cached fitness (e.g. new offspring) are simulated.
+
+        Args:
+            stop_fit (int, optional): If given, stop as soon as a batch contains a chromosome
+                                      reaching this fitness, cancelling the remaining batches.
+
+        Updates:
+            The fitness attribute of each newly evaluated chromosome, and self.pop_fit.
+
+        Returns:
+            LifeGrid: The chromosome that reached stop_fit, or None if none was found.
+        """
+        pending = [chromosome for chromosome in self.population if chromosome.fitness is None]
+        chunksize = max(1, len(pending) // (4 * self.max_workers))
+
+        futures = {}
+        for i in range(0, len(pending), chunksize):
+            batch = pending[i:i + chunksize]
+            futures[self._executor.submit(_evaluate_fitness_batch, batch)] = batch
+
+        # Collect the batches as they complete, rather than in submission order
+        for future in as_completed(futures):
+            best = None
+            for chromosome, fitness in zip(futures[future], future.result()):
+                chromosome.fitness = fitness
+                self.pop_fit += fitness
+                if stop_fit is not None and fitness >= stop_fit and (best is None or fitness > best.fitness):
+                    best = chromosome
+
+            if best is not None:
+                for remaining in futures:
+                    remaining.cancel()
+                return best
+
+        return None
 
     def init_population(self):
         """
@@ -133,7 +280,8 @@ class GeneticAlgorithm:
         for _ in range(self.pop_size):
             chromosome = self.generate_chromosome()
             self.population.append(chromosome)
-            self.pop_fit += self.get_fitness(chromosome)  # Fitness based on max size
+
+        self.evaluate_population()  # Also accumulates the total fitness based on max size
 
     def selection(self):
         """
@@ -143,22 +291,15 @@ class GeneticAlgorithm:
         Returns:
             list: A list containing two selected parent chromosomes.
         """
-        # Step 1: Calculate the probability for each chromosome
-        probabilities = [self.get_fitness(chromosome) / self.pop_fit for chromosome in self.population]
-
-        selected = []
+        self.evaluate_population()  # Only simulates chromosomes without a cached fitness
 
-        # Step 2: Select two parents based on their probabilities
-        for _ in range(2):  # We always select exactly two parents
-            random_choice = random.random()
-            cumulative_prob = 0
-            for i, prob in enumerate(probabilities):
-                cumulative_prob += prob
-                if random_choice <= cumulative_prob:
-                    selected.append(self.population[i])
-                    break
+        # Step 1: Build the roulette wheel from the cumulative fitness of the population
+        cumulative_fit = list(itertools.accumulate(self.get_fitness(chromosome) for chromosome in self.population))
 
-        return selected
+        # Step 2: Select two parents, binary searching the wheel for each spin
+        if not cumulative_fit[-1]:  # No fitness to weigh by, select uniformly
+            return random.choices(self.population, k=2)
+        return random.choices(self.population, cum_weights=cumulative_fit, k=2)  # We always select exactly two parents
 
     def crossover(self, parent1: LifeGrid, parent2: LifeGrid):
         """
@@ -214,30 +355,33 @@ class GeneticAlgorithm:
             individual (LifeGrid): The individual to mutate.
 
         Returns:
-            LifeGrid: The mutated individual.
+            LifeGrid: The mutated individual, or the given individual if no mutation happened.
         """
+        cells = None  # Copy of the individual's pattern, only made once a mutation happens
+
         for _ in range(self.mutation_count):
             if random.random() < self.mutation_prob:
-                # Create a copy of the individual's pattern
-                new_pattern = set(individual.pattern)
+                if cells is None:
+                    cells = list(individual.pattern)
 
                 # Decide whether to add or remove a cell
-                if random.random() < 0.5 and new_pattern:  # Remove an existing cell
-                    new_pattern.remove(random.choice(list(new_pattern)))
+                if random.random() < 0.5 and cells:  # Remove an existing cell
+                    index = random.randrange(len(cells))
+                    cells[index] = cells[-1]  # Move the last cell into its place to pop in O(1)
+                    cells.pop()
                 else:  # Add a new cell within grid bounds
-                    new_cell = (random.randint(self.grid_size // 4, self.grid_size // 4 + self.max_cells // 2),
-                                random.randint(self.grid_size // 4, self.grid_size // 4 + self.max_cells // 2))
-                    if len(new_pattern) < self.max_cells:
-                        new_pattern.add(new_cell)
+                    new_cell = self._region_cell(random.randrange(self.seed_side ** 2))
+                    if len(cells) < self.max_cells and new_cell not in cells:
+                        cells.append(new_cell)
 
-                # Ensure the pattern respects the max_cells constraint
-                if len(new_pattern) > self.max_cells:
-                    new_pattern = set(list(new_pattern)[:self.max_cells])
+        if cells is None:  # No mutation happened
+            return individual
 
-                # Update the individual with the new mutated pattern
-                individual = LifeGrid(new_pattern, self.grid_size)
+        # Ensure the pattern respects the max_cells constraint
+        del cells[self.max_cells:]
 
-        return individual
+        # Create the mutated individual once, with the final pattern
+        return LifeGrid(set(cells), self.grid_size)
 
     def next_generation(self):
         """
@@ -252,8 +396,10 @@ class GeneticAlgorithm:
         Updates:
             self.population: Replaces the current population with the new generation.
         """
+        self.evaluate_population()  # Only simulates chromosomes without a cached fitness
+
         # Sort the population by fitness in descending order
-        sorted_population = sorted(self.population, key=lambda ind: self.get_fitness(ind), reverse=True)
+        sorted_population = sorted(self.population, key=self.get_fitness, reverse=True)
 
         # Determine the size of the elite group (top 10%)
         elite_size = max(1, int(0.1 * len(self.population)))  # Ensure at least one elite individual
@@ -264,8 +410,9 @@ class GeneticAlgorithm:
         top_elite = elite_group[:top_elite_size]
         bottom_elite = elite_group[top_elite_size:]
 
-        # Initialize the next generation with the top elite individuals
-        next_gen = deepcopy(top_elite)
+        # Initialize the next generation with the top elite individuals. They are carried over by
+        # reference, since crossover and mutation always create new LifeGrid objects
+        next_gen = list(top_elite)
 
         # Perform crossover and mutation to fill the rest with the population
         non_elite_population = sorted_population[elite_size:]
@@ -289,6 +436,9 @@ class GeneticAlgorithm:
         # Update the population with the new generation
         self.population = next_gen
 
+        # Keep the total fitness of the carried over individuals, new offspring are added once evaluated
+        self.pop_fit = sum(ind.fitness for ind in next_gen if ind.fitness is not None)
+
 
 if __name__ == "__main__":
     # Initialize the Genetic Algorithm
@@ -296,6 +446,7 @@ if __name__ == "__main__":
 
     # Find Methuselah
     methuselah = ga.find_methuselah()
+    ga.close()
 
     if methuselah[0]:
         print(f"Found Methuselah pattern with fitness {methuselah[1]}!")
@@ -1,12 +1,100 @@
 # rplife/grid.py
 
-import collections
+import functools
+
+
+def _block_rows(grid_size):
+    """
+    Returns the number of board rows taken by each grid when several grids are stacked in one bitboard.
+    Stacked grids are separated by at least one always-dead padding row, and each one starts on a byte
+    boundary so the boards can be sliced out of the bytes of the stacked bitboard.
+
+    Args:
+        grid_size (int): The size of the grids.
+
+    Returns:
+        int: The number of board rows per stacked grid.
+    """
+    stride = grid_size + 2
+    rows = grid_size + 2
+    while rows * stride % 8:
+        rows += 1
+    return rows
+
+
+@functools.lru_cache(maxsize=128)
+def _make_evolve(grid_size, count=1):
+    """
+    Builds the evolve kernel of a bitboard, specialized for the given grid size.
+    The bitboard layout only depends on the grid size, so it is computed once and bound into
+    the kernel as constants, and the kernel is shared by all grids of that size.
+
+    Args:
+        grid_size (int): The size of the grid.
+        count (int, optional): The number of grids stacked in the bitboard (see _block_rows). Default is 1.
+
+    Returns:
+        function: A function computing the bitboard of the next generation from the current one.
+    """
+    # Cells are valid from 0 to grid_size inclusive, and each board row ends with an
+    # always-dead padding column so that shifting a row never spills onto the next one
+    stride = grid_size + 2
+    row_mask = (1 << (grid_size + 1)) - 1
+    interior_mask = sum(row_mask << row * stride for row in range(grid_size + 1))
+
+    # Repeat the grid for each stacked board, so the padding rows between them stay dead
+    block_bits = _block_rows(grid_size) * stride
+    interior_mask = sum(interior_mask << board * block_bits for board in range(count))
+
+    def evolve_board(board):
+        """
+        Computes the next generation of a bitboard according to the Game of Life rules.
+
+        Args:
+            board (int): The bitboard of the current generation.
+
+        Returns:
+            int: The bitboard of the next generation.
+        """
+        # Shift the board so each cell lines up with its west/east neighbor. Edge cells only
+        # shift into the padding column, which is cleared again by the interior mask
+        west = board << 1
+        east = board >> 1
+
+        # Half/full adders give, as two bit-planes, the sum of each cell with its west and east neighbors
+        west_xor_board = west ^ board
+        row_1 = west_xor_board ^ east
+        row_2 = (west & board) | (east & west_xor_board)
+
+        # Add the sums of the rows above and below, giving the 0-9 count of the 3x3 block around each cell
+        # as sum_1 + 2 * (pairs_1 + 2 * pairs_2 + carry)
+        above_1, above_2 = row_1 << stride, row_2 << stride
+        below_1, below_2 = row_1 >> stride, row_2 >> stride
+        above_xor_row_1 = above_1 ^ row_1
+        sum_1 = above_xor_row_1 ^ below_1
+        carry = (above_1 & row_1) | (below_1 & above_xor_row_1)
+        above_xor_row_2 = above_2 ^ row_2
+        pairs_1 = above_xor_row_2 ^ below_2
+        pairs_2 = (above_2 & row_2) | (below_2 & above_xor_row_2)
+
+        # A cell is alive in the next generation when its block count is 3 (two or three neighbors for
+        # a live cell, three neighbors for a dead one), or when it is alive and its block count is 4
+        three = sum_1 & ~pairs_2 & (pairs_1 ^ carry)
+        four = ~sum_1 & ((pairs_2 & ~(pairs_1 | carry)) | (~pairs_2 & pairs_1 & carry))
+        return (three | (board & four)) & interior_mask
+
+    return evolve_board
 
 
 class LifeGrid:
     """
     A class representing a grid for Conway's Game of Life. It holds the current pattern of live cells
     and provides functionality for evolving the grid according to the rules of the game.
+
+    The live cells are packed into the bits of a single integer (a bitboard), where cell (row, col)
+    is stored at bit row * stride + col, and each row is followed by one padding column. This lets a
+    whole generation be computed with a handful of bitwise operations on the board instead of a
+    dictionary lookup per neighbor of every live cell.
     """
 
     def __init__(self, pattern, grid_size=20):
@@ -17,9 +105,67 @@ class LifeGrid:
             pattern (set): A set of tuples representing the initial live cell coordinates.
             grid_size (int, optional): The size of the grid. The default is 20, creating a 20x20 grid.
         """
-        self.pattern = pattern
         self.end_row = grid_size
         self.end_col = grid_size
+        self.pattern = pattern
+        self.fitness = None  # Cached fitness, set when evaluated by the GeneticAlgorithm
+
+    @property
+    def fitness(self):
+        """
+        The cached fitness of the grid, as set by the GeneticAlgorithm. The fitness is stored together with
+        the board it was evaluated for, so it reads as None again once the board changes (e.g. by evolving
+        the grid or assigning a new pattern).
+
+        Returns:
+            int: The fitness of the current board, or None if it was not evaluated.
+        """
+        if self._fitness is not None and self._fitness[0] == self.board:
+            return self._fitness[1]
+        return None
+
+    @fitness.setter
+    def fitness(self, fitness):
+        """
+        Caches the fitness of the current board.
+
+        Args:
+            fitness (int): The fitness of the current board, or None to clear the cached fitness.
+        """
+        self._fitness = None if fitness is None else (self.board, fitness)
+
+    @property
+    def pattern(self):
+        """
+        The live cells of the grid, decoded from the bitboard. The pattern is returned as a frozenset,
+        since changing it would not update the grid; assign a new pattern instead.
+
+        Returns:
+            frozenset: A set of tuples representing the live cell coordinates.
+        """
+        cells = []
+        board = self.board
+        stride = self.end_col + 2
+        while board:
+            low_bit = board & -board
+            cells.append(divmod(low_bit.bit_length() - 1, stride))
+            board ^= low_bit
+        return frozenset(cells)
+
+    @pattern.setter
+    def pattern(self, pattern):
+        """
+        Packs the given live cells into the bitboard. Cells outside the grid are ignored.
+
+        Args:
+            pattern (set): A set of tuples representing the live cell coordinates.
+        """
+        board = 0
+        stride = self.end_col + 2
+        for row, col in pattern:
+            if 0 <= row <= self.end_row and 0 <= col <= self.end_col:
+                board |= 1 << (row * stride + col)
+        self.board = board
 
     def evolve(self):
         """
@@ -28,33 +174,9 @@ class LifeGrid:
         - A dead cell with exactly three live neighbors comes to life.
         - All other cells either stay dead or die.
 
-        Updates the pattern attribute with the new set of live cells for the next generation.
+        Updates the board (and therefore the pattern) with the live cells of the next generation.
         """
-        neighbors = (
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),          (0, 1),
-            (1, -1), (1, 0), (1, 1),
-        )
-
-        num_neighbors = collections.defaultdict(int)
-
-        # Count the number of neighbors for each live cell
-        for row, col in self.pattern:
-            for drow, dcol in neighbors:
-                new_row, new_col = row + drow, col + dcol
-                if 0 <= new_row <= self.end_row and 0 <= new_col <= self.end_col:
-                    num_neighbors[(new_row, new_col)] += 1
-
-        # Determine which cells stay alive and which cells come to life
-        stay_alive = {
-                         cell for cell, num in num_neighbors.items() if num in {2, 3}
-                     } & self.pattern
-        come_alive = {
-                         cell for cell, num in num_neighbors.items() if num == 3
-                     } - self.pattern
-
-        # Update the pattern with cells that stay alive or come alive
-        self.pattern = stay_alive | come_alive
+        self.board = _make_evolve(self.end_row)(self.board)
 
     def get_size(self):
         """
@@ -63,4 +185,4 @@ class LifeGrid:
         Returns:
             int: The number of live cells in the pattern.
         """
-        return len(self.pattern)
+        return self.board.bit_count()
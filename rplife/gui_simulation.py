@@ -1,7 +1,12 @@
 # rplife/gui_simulation.py
 
 import copy
+import queue
+import statistics
+import threading
+import time
 import tkinter as tk
+from collections import deque
 from rplife.grid import LifeGrid
 from rplife.pattern import load_from_toml
 
@@ -11,14 +16,18 @@ class GuiSimulation:
     A class to simulate Conway's Game of Life using a graphical user interface (GUI).
     """
 
-    def __init__(self, life: LifeGrid, cell_size=10, refresh_rate=50):
+    def __init__(self, life: LifeGrid, cell_size=10, refresh_rate=50, root=None):
         """
         Initializes the GUI simulation with the given LifeGrid, cell size, and refresh rate.
+        Call run() to show the window and start the Tk event loop.
 
         Args:
             life (LifeGrid): An instance of the LifeGrid class representing the grid's initial state.
             cell_size (int, optional): The size of each cell in the grid for display. Default is 10.
             refresh_rate (int, optional): The time in milliseconds between each simulation step. Default is 50.
+                                          The time taken to compute and draw a step counts towards it.
+            root (tk.Tk, optional): The Tk root window to use, so it can be reused across simulations.
+                                    A new one is created by default.
         """
         self.start_button = None
         self.stop_button = None
@@ -30,24 +39,33 @@ class GuiSimulation:
 
         self.alive_color = 'black'
         self.dead_color = 'white'
+        self.grid_color = 'black'
         self.gen = 0
 
-        self.canvas_cells = [[0] * self.cols for _ in range(self.rows)]
-        self.root = tk.Tk()
+        self.image = None  # Image of the grid of cells shown on the canvas
+        self.tile_size = 16  # Cells per side of the tiles of the image, redrawn only when a cell in them changes
+        self.prev_live = None  # Live cells currently drawn in the image
+        self.root = root if root is not None else tk.Tk()
         self.root.title('Game of Life')
 
         self.running = False  # To track the running state of the simulation
+        self.stop_event = None  # Set to stop the thread evolving the grid
+        self.generations = queue.Queue()  # Generations evolved by the thread, waiting to be drawn
+        self.root.bind("<<Generation>>", self.move_to_next_gen)
 
         # Create a frame to hold the labels at the top
         self.top_frame = tk.Frame(self.root)
         self.top_frame.pack(side=tk.TOP, fill=tk.X)
 
         # Create the labels for Generation and Alive Cells
-        self.label = tk.Label(self.top_frame, text=self.get_label_text(), font="bold")
+        self.label_text = self.get_label_text()  # Text currently shown by the label
+        self.label = tk.Label(self.top_frame, text=self.label_text, font="bold")
         self.label.pack(anchor='center', pady=5)
 
         # Create the canvas after initializing the frame
-        self.canvas = tk.Canvas(self.root, width=self.cols * self.cell_size, height=self.rows * self.cell_size, bg='white')
+        # One extra pixel holds the grid line closing the last column and row of cells
+        self.canvas = tk.Canvas(self.root, width=self.cols * self.cell_size + 1, height=self.rows * self.cell_size + 1,
+                                bg='white')
         self.canvas.pack()
 
         # Create a frame to hold the buttons at the bottom
@@ -60,11 +78,41 @@ class GuiSimulation:
         self.root.resizable(False, False)
         self.create_canvas()  # Create the grid canvas
 
+    def run(self):
+        """Shows the window and runs the Tk event loop until the window is closed."""
         self.root.mainloop()
 
+    def load_pattern(self, life: LifeGrid):
+        """
+        Replaces the simulated grid with a new LifeGrid, reusing the window and its canvas.
+        Stops the current simulation and resets the generation count.
+
+        Args:
+            life (LifeGrid): An instance of the LifeGrid class representing the new grid's initial state.
+        """
+        self.stop_simulation()
+        self.life = copy.deepcopy(life)
+        self.gen = 0
+
+        if (life.end_row, life.end_col) == (self.rows, self.cols):
+            self.update_canvas(self.life.pattern)  # Same grid size, redraw the existing image
+        else:
+            self.rows = life.end_row
+            self.cols = life.end_col
+            self.canvas.config(width=self.cols * self.cell_size + 1, height=self.rows * self.cell_size + 1)
+            self.create_canvas()
+
+        self.update_label()
+
     def update_label(self):
-        """Updates the label displaying the current generation and number of alive cells."""
-        self.label.config(text=self.get_label_text())
+        """
+        Updates the label displaying the current generation and number of alive cells.
+        The label is only reconfigured if its text changed, which spares a Tk relayout.
+        """
+        label_text = self.get_label_text()
+        if label_text != self.label_text:
+            self.label.config(text=label_text)
+            self.label_text = label_text
 
     def get_label_text(self):
         """
@@ -73,41 +121,150 @@ class GuiSimulation:
         Returns:
             str: A formatted string containing the current generation and the number of alive cells.
         """
-        alive_cells_count = len(self.life.pattern)
+        alive_cells_count = self.life.get_size()  # Counted on the bitboard, without decoding the pattern
         return f"Generation: {self.gen}  Alive Cells: {alive_cells_count}"
 
     def create_canvas(self):
         """
-        Creates the grid of cells on the canvas, initializing each cell to the dead color (white).
-        Then, it updates the grid to reflect the current state of live cells.
+        Creates the image holding the grid of cells and shows it on the canvas, so the whole grid is drawn
+        as one canvas item instead of one rectangle per cell. Then, it updates the grid to reflect the
+        current state of live cells.
+
+        Each cell is drawn with the grid line along its top and left; the image has one extra pixel column
+        and row for the grid line closing the right and bottom edges of the grid.
         """
-        for y in range(self.rows):
-            for x in range(self.cols):
-                x1 = x * self.cell_size
-                y1 = y * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
+        width = self.cols * self.cell_size + 1
+        height = self.rows * self.cell_size + 1
+
+        self.canvas.delete("grid")
+        self.image = tk.PhotoImage(width=width, height=height)
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image, tags="grid")
 
-                # Fill all canvas cells in dead color by default
-                canvas_square_id = self.canvas.create_rectangle(x1, y1, x2, y2, fill=self.dead_color, outline="black")
-                self.canvas_cells[y][x] = canvas_square_id
+        # Pixels of a line through a cell: the grid line on its left, then the color of the cell
+        self.grid_pixel = self.color_bytes(self.grid_color)
+        self.alive_line = self.grid_pixel + self.color_bytes(self.alive_color) * (self.cell_size - 1)
+        self.dead_line = self.grid_pixel + self.color_bytes(self.dead_color) * (self.cell_size - 1)
 
+        # Pixels of a line through eight cells, for each byte of a row bitmask, so rows are rendered a byte at a time
+        self.byte_lines = [b"".join(self.alive_line if byte >> x & 1 else self.dead_line for x in range(8))
+                           for byte in range(256)]
+        self.row_pixels = {}  # Rendered pixel rows, keyed by the bitmask of the live cells in the row and its extent
+
+        self.prev_live = None  # Nothing is drawn yet
         self.update_canvas(self.life.pattern)
 
+    def color_bytes(self, color):
+        """
+        Converts a Tk color to the bytes of a pixel of the grid image.
+
+        Args:
+            color (str): A Tk color name or hex string.
+
+        Returns:
+            bytes: The red, green and blue values of the color.
+        """
+        return bytes(channel >> 8 for channel in self.root.winfo_rgb(color))
+
     def update_canvas(self, live):
         """
         Updates the grid on the canvas to reflect the current state of live cells.
+        The image is split into tiles, and only the tiles holding a cell that changed are rendered into
+        PPM images and blitted; the whole grid is drawn with a single blit when most of it changed.
+
+        Args:
+            live (frozenset): A set of tuples representing the coordinates of live cells.
+        """
+        prev_live = self.prev_live
+        if live == prev_live:
+            return
+
+        # Bind the grid shape to locals, the loops below run for every live or changed cell
+        rows, cols = self.rows, self.cols
+
+        # Pack the live cells into one bitmask per row, touching each live cell once
+        # instead of testing every cell of the grid for membership
+        row_masks = [0] * rows
+        for y, x in live:
+            if 0 <= y < rows and 0 <= x < cols:
+                row_masks[y] |= 1 << x
+
+        if len(self.row_pixels) > 4096:
+            self.row_pixels.clear()  # Keep the cache bounded on large, busy grids
+
+        tile_size = self.tile_size
+        tiles_count = -(-rows // tile_size) * -(-cols // tile_size)
+        if prev_live is None:
+            dirty_tiles = None  # Nothing is drawn yet
+        else:
+            # Tiles holding a cell that was born or died since the last update
+            dirty_tiles = {(y // tile_size, x // tile_size) for y, x in live ^ prev_live
+                           if 0 <= y < rows and 0 <= x < cols}
+
+        draw_region = self.draw_region
+        if dirty_tiles is None or len(dirty_tiles) > tiles_count // 2:
+            draw_region(row_masks, 0, 0, rows, cols)
+        else:
+            for tile_row, tile_col in dirty_tiles:
+                row, col = tile_row * tile_size, tile_col * tile_size
+                draw_region(row_masks, row, col, min(tile_size, rows - row), min(tile_size, cols - col))
+
+        self.prev_live = live
+
+    def draw_region(self, row_masks, row, col, height, width):
+        """
+        Renders a rectangle of cells into a PPM image and blits it at its place in the grid image.
 
         Args:
-            live (set): A set of tuples representing the coordinates of live cells.
+            row_masks (list): The bitmask of the live cells of each row of the grid.
+            row (int): The row of the top left cell of the rectangle.
+            col (int): The column of the top left cell of the rectangle.
+            height (int): The number of rows of cells in the rectangle.
+            width (int): The number of columns of cells in the rectangle.
+        """
+        # Regions on the right and bottom edges of the grid also hold the closing grid lines
+        right_edge = col + width == self.cols
+        bottom_edge = row + height == self.rows
+
+        # Rows with the same live cells have the same pixels, which is common (empty rows, above all)
+        row_pixels = self.row_pixels
+        get_pixels = row_pixels.get
+        render_row = self.render_row
+        width_mask = (1 << width) - 1
+        pixel_rows = []
+        for mask in row_masks[row:row + height]:
+            key = (mask >> col & width_mask, width, right_edge)
+            pixels = get_pixels(key)
+            if pixels is None:
+                pixels = row_pixels[key] = render_row(*key)
+            pixel_rows.append(pixels)
+
+        cell_size = self.cell_size
+        pixel_width = width * cell_size + right_edge
+        if bottom_edge:
+            pixel_rows.append(self.grid_pixel * pixel_width)
+        ppm_header = f"P6 {pixel_width} {height * cell_size + bottom_edge} 255\n".encode()
+        self.image.put(ppm_header + b"".join(pixel_rows), to=(col * cell_size, row * cell_size))
+
+    def render_row(self, mask, width, right_edge=False):
         """
-        for y in range(self.rows):
-            for x in range(self.cols):
-                canvas_square_id = self.canvas_cells[y][x]
-                if (y, x) in live:
-                    self.canvas.itemconfig(canvas_square_id, fill=self.alive_color)
-                else:
-                    self.canvas.itemconfig(canvas_square_id, fill=self.dead_color)
+        Renders the pixels of a row of cells, including the grid line along its top.
+
+        Args:
+            mask (int): A bitmask of the live cells in the row, where bit x is set if cell x is alive.
+            width (int): The number of cells in the row.
+            right_edge (bool, optional): Whether the row ends on the right edge of the grid, and so also holds
+                                         the grid line closing it. Default is False.
+
+        Returns:
+            bytes: The pixels of the row of cells.
+        """
+        byte_lines = self.byte_lines
+        cell_line = b"".join(byte_lines[mask >> x & 0xFF] for x in range(0, width, 8))
+        cell_line = cell_line[:width * len(self.alive_line)]  # Drop the cells past the end of the row
+        if right_edge:
+            cell_line += self.grid_pixel
+        grid_line = self.grid_pixel * (width * self.cell_size + right_edge)  # Grid line along the top of the row
+        return grid_line + cell_line * (self.cell_size - 1)
 
     def create_buttons(self):
         """
@@ -129,40 +286,108 @@ class GuiSimulation:
     def start_simulation(self):
         """
         Starts the simulation if it is not already running. Begins evolving the grid through generations.
+        The grid is evolved on a background thread, so a slow generation does not block the window;
+        all the drawing stays on the main thread.
         """
         if not self.running:
             self.running = True
-            self.move_to_next_gen()
+            self.stop_event = threading.Event()
+            self.generations = queue.Queue(maxsize=2)  # Bounded, so evolving never runs far ahead of drawing
+            worker = threading.Thread(target=self.evolve_loop, daemon=True,
+                                      args=(copy.copy(self.life), self.generations, self.stop_event))
+            worker.start()
 
     def stop_simulation(self):
         """
         Stops the simulation from running, halting the evolution of the grid.
         """
         self.running = False
+        if self.stop_event is not None:
+            self.stop_event.set()
 
-    def move_to_next_gen(self):
+    def evolve_loop(self, life, generations, stop_event):
+        """
+        Evolves a copy of the grid on a background thread until the simulation is stopped. Each generation is
+        queued and announced to the main thread with a <<Generation>> event, roughly every refresh rate.
+
+        Args:
+            life (LifeGrid): The copy of the grid to evolve, only used by this thread.
+            generations (queue.Queue): The queue of the generations to draw.
+            stop_event (threading.Event): Set when the simulation is stopped.
         """
-        Moves the simulation to the next generation, updates the canvas, and sets up the next refresh cycle.
-        This function is called recursively to update the simulation at regular intervals.
+        step_times = deque(maxlen=10)  # Time in milliseconds taken by the most recent simulation steps
+        next_generations = {}  # Generations already evolved, keyed by the board they evolved from
+
+        # Bind the loop invariants to locals, this loop runs for every generation
+        evolve = life.evolve
+        get_generation = next_generations.get
+        perf_counter = time.perf_counter
+
+        while not stop_event.is_set():
+            start = perf_counter()
+
+            # Once the pattern settles into a still life or an oscillator, its next generations are all known
+            generation = get_generation(life.board)
+            if generation is None:
+                board = life.board
+                evolve()
+                generation = (life.board, life.pattern)
+                if len(next_generations) >= 4096:
+                    next_generations.clear()  # Keep the cache bounded on patterns that keep changing
+                next_generations[board] = generation
+            else:
+                life.board = generation[0]
+
+            # Wait for a free slot in the queue, unless the simulation is stopped meanwhile
+            while not stop_event.is_set():
+                try:
+                    generations.put(generation, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            else:
+                return
+
+            try:
+                self.root.event_generate("<<Generation>>", when="tail")
+            except (RuntimeError, tk.TclError):
+                return  # The window was closed
+            step_times.append((perf_counter() - start) * 1000)
+
+            # Wait for the refresh rate interval, less the time a step is expected to take,
+            # so slow generations do not stretch the interval between frames
+            expected_step_time = statistics.fmean(step_times)
+            stop_event.wait(max(1, self.refresh_rate - expected_step_time) / 1000)
+
+    def move_to_next_gen(self, event=None):
         """
-        if self.running:
-            self.gen += 1
-            self.life.evolve()
-            updated_pattern = set(self.life.pattern)
+        Moves the simulation to the generations evolved by the background thread, then updates the canvas
+        and the label. Called on the main thread for each <<Generation>> event; if several generations are
+        waiting, only the latest one is drawn.
 
-            self.update_canvas(updated_pattern)
+        Args:
+            event (tk.Event, optional): The <<Generation>> event.
+        """
+        latest = None
+        while True:
+            try:
+                board, pattern = self.generations.get_nowait()
+            except queue.Empty:
+                break
+
+            if self.running:  # Generations evolved after the simulation was stopped are dropped
+                self.gen += 1
+                self.life.board = board
+                latest = pattern
+
+        if latest is not None:
+            self.update_canvas(latest)
             self.update_label()
 
-            # Re-call the function after the refresh rate interval
-            self.root.after(self.refresh_rate, self.move_to_next_gen)
-
 
 if __name__ == "__main__":
-    # Example list of alive cells
-    alive_cells = load_from_toml(pattern_name="9:131")
-
-    # Convert the alive cells to a set of tuples
-    alive_cells_set = set(tuple(cell) for cell in alive_cells)
+    # Example set of alive cells
+    alive_cells_set = load_from_toml(pattern_name="9:131")
 
     # Define the grid size
     grid_size = 20  # Adjust the size as needed for the grid
@@ -171,4 +396,4 @@ if __name__ == "__main__":
     life = LifeGrid(pattern=alive_cells_set, grid_size=grid_size)
 
     # Run the GUI simulation
-    GuiSimulation(life=life, cell_size=20, refresh_rate=50)
+    GuiSimulation(life=life, cell_size=20, refresh_rate=50).run()
@@ -1,6 +1,14 @@
 # rplife/patterns.py
 
-import toml
+import functools
+import os
+
+try:
+    import tomllib  # Python 3.11+
+except ModuleNotFoundError:
+    import tomli as tomllib
+
+import tomli_w
 
 
 def save_to_toml(methuselah_pattern, methuselah_fitness, file_name="patterns.toml"):
@@ -16,25 +24,75 @@ def save_to_toml(methuselah_pattern, methuselah_fitness, file_name="patterns.tom
         print("No Methuselah pattern to save.")
         return
 
-    # Convert the pattern to a list of lists
-    alive_cells = [list(cell) for cell in methuselah_pattern]
+    save_patterns_to_toml([(methuselah_pattern, methuselah_fitness)], file_name)
+
+
+def save_patterns_to_toml(methuselahs, file_name="patterns.toml"):
+    """
+    Save several Methuselah patterns to a TOML file, each with a dynamic section name.
+    All the patterns are serialized together and written to the file at once.
+
+    Patterns of a batch with the same size and fitness get a numbered suffix on their section name
+    (e.g. "10:124", "10:124-2"), so none of them overwrites another.
+
+    Args:
+        methuselahs (Iterable[tuple]): The (pattern, fitness) pairs to save, where each pattern
+                                       is a set of (x, y) tuples. Empty patterns are skipped.
+        file_name (str): The name of the TOML file to save the patterns to.
+
+    Returns:
+        List[str]: The section names of the saved patterns, in the given order.
+    """
+    # Create a dictionary for TOML format, with a section per pattern
+    data = {}
+    skipped = 0
+    for methuselah_pattern, methuselah_fitness in methuselahs:
+        if not methuselah_pattern:
+            skipped += 1
+            continue
+
+        # Generate the section name dynamically based on size and fitness, numbering duplicates
+        base_name = f"{len(methuselah_pattern)}:{methuselah_fitness}"
+        section_name = base_name
+        duplicate = 1
+        while section_name in data:
+            duplicate += 1
+            section_name = f"{base_name}-{duplicate}"
+
+        # Convert the pattern to a list of lists
+        data[section_name] = {"alive_cells": [list(cell) for cell in methuselah_pattern]}
 
-    # Generate the section name dynamically based on size and fitness
-    section_name = f"{len(methuselah_pattern)}:{methuselah_fitness}"
+    if skipped:
+        print(f"Skipped {skipped} empty Methuselah pattern(s).")
 
-    # Create a dictionary for TOML format
-    data = {
-        section_name: {
-            "alive_cells": alive_cells
-        }
-    }
+    if not data:
+        print("No Methuselah pattern to save.")
+        return []
 
     # Write the data to a TOML file
     with open(file_name, "a+", encoding="utf-8") as toml_file:
-        toml_string = toml.dumps(data)  # Generate the TOML string
+        toml_string = tomli_w.dumps(data)  # Generate the TOML string for all the patterns
         toml_file.write(toml_string)  # Write the string to the file
 
-    print(f"Methuselah pattern saved to {file_name}.")
+    print(f"{len(data)} Methuselah pattern(s) saved to {file_name}.")
+    return list(data)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_toml(file_name, mtime_ns):
+    """
+    Parses a TOML file. Cached on the file name and its modification time,
+    so loading several patterns from the same file only parses it once.
+
+    Args:
+        file_name (str): The name of the TOML file to parse.
+        mtime_ns (int): The modification time of the file, so that changes to the file are picked up.
+
+    Returns:
+        dict: The data of the TOML file.
+    """
+    with open(file_name, "rb") as toml_file:
+        return tomllib.load(toml_file)
 
 
 def load_from_toml(file_name="patterns.toml", pattern_name=None):
@@ -46,18 +104,17 @@ def load_from_toml(file_name="patterns.toml", pattern_name=None):
         pattern_name (str): The name of the pattern to retrieve (e.g., "15:101").
 
     Returns:
-        List[List[int]]: The Methuselah pattern as a list of [x, y] coordinate pairs,
-                         or None if the pattern is not found.
+        set: The Methuselah pattern as a set of (x, y) tuples, or None if the pattern is not found.
     """
     try:
-        # Load the TOML data from the file
-        with open(file_name, "r", encoding="utf-8") as toml_file:
-            data = toml.load(toml_file)
+        # Load the TOML data from the file, unless it was already parsed since it last changed
+        data = _read_toml(os.path.abspath(file_name), os.stat(file_name).st_mtime_ns)
 
         # Retrieve the specific pattern by name
         if pattern_name in data:
             section_data = data[pattern_name]
-            alive_cells = section_data.get("alive_cells", [])
+            # Convert the pairs to tuples, building a new set so the cached data is left intact
+            alive_cells = {(cell[0], cell[1]) for cell in section_data.get("alive_cells", ())}
             return alive_cells
         else:
             print(f"Pattern '{pattern_name}' not found in the TOML file.")
@@ -1,7 +1,7 @@
 # rplife/simulation.py
 
 import copy
-from rplife.grid import LifeGrid
+from rplife.grid import LifeGrid, _block_rows, _make_evolve
 
 
 class Simulation:
@@ -17,7 +17,7 @@ class Simulation:
             life (LifeGrid): An instance of the LifeGrid class representing the initial state of the grid.
             gen_limit (int, optional): The maximum number of generations to simulate. Default is 400.
         """
-        self.life = copy.deepcopy(life)
+        self.life = copy.copy(life)  # The board is an immutable int, so a shallow copy is independent
 
         self.gen = 0
         self.gen_limit = gen_limit
@@ -25,27 +25,111 @@ class Simulation:
         self.size = self.life.get_size()
         self.max_size = self.size
         self.max_size_gen = self.gen
-        self.gen_history = []
+        self.gen_history = {}  # Maps the bitboard of each past pattern to its generation
 
     def simulate(self):
         """
         Runs the simulation for the specified number of generations or until stabilization occurs.
-        Each generation, the pattern evolves, and the size is updated. The history of patterns is recorded.
+        Each generation, the pattern evolves, and the size is updated. The history of patterns is recorded
+        by their bitboards, so detecting a repeated pattern is a single dictionary lookup.
 
         The simulation stops if the maximum number of generations is reached or if the pattern stabilizes.
         """
-        while self.gen <= self.gen_limit and not self.stabilized():
-            self.gen += 1
-
+        # Bind the loop invariants to locals, this loop runs for every generation of every chromosome
+        life = self.life
+        evolve = life.evolve
+        update_size = self.update_size
+        gen_history = self.gen_history
+        gen_limit = self.gen_limit
+
+        while self.gen <= gen_limit and life.board not in gen_history:  # Same check as stabilized()
             # Record the current pattern for stabilization check
-            self.gen_history.append(copy.deepcopy(self.life.pattern))
-            self.life.evolve()  # Evolve the pattern for the next generation
-            self.update_size()  # Update the current size of the pattern
+            gen_history[life.board] = self.gen
+
+            self.gen += 1
+            evolve()  # Evolve the pattern for the next generation
+            update_size()  # Update the current size of the pattern
 
         if self.gen > self.gen_limit and not self.stabilized():
             self.max_size = 0
             self.max_size_gen = self.gen_limit
 
+    @staticmethod
+    def simulate_batch(lives, gen_limit=400):
+        """
+        Simulates several LifeGrids of the same size in lockstep and returns the maximum size of each one.
+
+        The grids are stacked into a single bitboard, so each generation of the whole batch is computed with
+        one call of the evolve kernel. Every grid is tracked exactly as simulate() would: it stops once its
+        pattern repeats, and its maximum size is 0 if it does not stabilize within the generation limit.
+
+        Args:
+            lives (list): LifeGrid instances with the same grid size. They are not modified.
+            gen_limit (int, optional): The maximum number of generations to simulate. Default is 400.
+
+        Returns:
+            list: The maximum size of the pattern of each LifeGrid, in the same order.
+        """
+        if not lives:
+            return []
+
+        grid_size = lives[0].end_row
+        if any(life.end_row != grid_size for life in lives):
+            raise ValueError("All LifeGrids of a batch must have the same grid size.")
+
+        # Each grid takes its own block of bytes in the stacked bitboard
+        block_bytes = _block_rows(grid_size) * (grid_size + 2) // 8
+        data = b"".join(life.board.to_bytes(block_bytes, "little") for life in lives)
+
+        max_sizes = [life.get_size() for life in lives]
+        patterns = [data[offset:offset + block_bytes] for offset in range(0, len(data), block_bytes)]
+        gen_histories = [{} for _ in lives]
+        active = list(range(len(lives)))  # Grids that have not stabilized yet
+
+        stacked = active  # Grids in the stacked bitboard, in order
+        board = int.from_bytes(data, "little")
+        evolve = _make_evolve(grid_size, len(stacked))
+
+        gen = 0
+        while active and gen <= gen_limit:
+            # Record the current patterns for stabilization check
+            for i in active:
+                gen_histories[i][patterns[i]] = gen
+
+            gen += 1
+            board = evolve(board)  # Evolve every stacked grid for the next generation
+            data = board.to_bytes(block_bytes * len(stacked), "little")
+
+            still_active = []
+            was_active = set(active)
+            for position, i in enumerate(stacked):
+                if i not in was_active:
+                    continue  # Already stabilized, waiting to be dropped when restacking
+
+                offset = position * block_bytes
+                pattern = data[offset:offset + block_bytes]
+
+                size = int.from_bytes(pattern, "little").bit_count()
+                if size > max_sizes[i]:
+                    max_sizes[i] = size
+
+                patterns[i] = pattern
+                if pattern not in gen_histories[i]:
+                    still_active.append(i)
+            active = still_active
+
+            # Restack the grids still active once most of the stacked ones have stabilized
+            if active and len(active) <= len(stacked) // 2:
+                stacked = active
+                board = int.from_bytes(b"".join(patterns[i] for i in stacked), "little")
+                evolve = _make_evolve(grid_size, len(stacked))
+
+        # The grids still active reached the generation limit without stabilizing
+        for i in active:
+            max_sizes[i] = 0
+
+        return max_sizes
+
     def stabilized(self):
         """
         Checks if the pattern has stabilized, i.e., if it has appeared before in the simulation history.
@@ -53,7 +137,18 @@ class Simulation:
         Returns:
             bool: True if the pattern has stabilized, otherwise False.
         """
-        return self.life.pattern in self.gen_history
+        return self.life.board in self.gen_history
+
+    def get_cycle_length(self):
+        """
+        Returns the period of the cycle the pattern has stabilized into: 1 for a still life, 2 for a blinker,
+        and so on. Like stabilized(), this is a single lookup in the simulation history.
+
+        Returns:
+            int: The cycle length of the pattern, or 0 if it has not stabilized.
+        """
+        first_gen = self.gen_history.get(self.life.board)
+        return 0 if first_gen is None else self.gen - first_gen
 
     def update_size(self):
         """